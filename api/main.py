@@ -11,6 +11,7 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from ml_model.predict import fraud_predictor
 from database.db_connection import db_manager
 from utils.logger import fraud_logger
+from utils.request_cache import request_cache, IdempotencyConflict
 
 app = FastAPI(title="Fraud Detection API", version="1.0.0")
 
@@ -20,6 +21,7 @@ class TransactionRequest(BaseModel):
     location: str
     device: str
     timestamp: str = None
+    idempotency_key: str = None
 
 class TransactionResponse(BaseModel):
     prediction: str
@@ -36,40 +38,69 @@ async def startup_event():
 async def root():
     return {
         "message": "Fraud Detection API is running",
-        "endpoints": ["/check_transaction", "/stats"],
+        "endpoints": ["/check_transaction", "/stats", "/cache_stats"],
         "version": "1.0.0"
     }
 
+def _process_transaction(transaction: TransactionRequest) -> Dict[str, Any]:
+    """Score, log and store a transaction"""
+    # Prepare transaction data
+    transaction_data = {
+        "user_id": transaction.user_id,
+        "amount": transaction.amount,
+        "location": transaction.location,
+        "device": transaction.device,
+        "timestamp": transaction.timestamp or datetime.now().isoformat()
+    }
+    
+    # Get prediction
+    result = fraud_predictor.predict_single_transaction(transaction_data)
+    
+    if "error" in result:
+        raise HTTPException(status_code=500, detail=result["error"])
+    
+    # Log the transaction
+    fraud_logger.log_transaction(
+        transaction.user_id,
+        result["prediction"],
+        result["confidence"],
+        transaction_data
+    )
+    
+    # Store in database
+    transaction_data.update(result)
+    db_manager.insert_transaction(transaction_data)
+    
+    return result
+
 @app.post("/check_transaction", response_model=TransactionResponse)
 async def check_transaction(transaction: TransactionRequest):
     """Check if a transaction is fraudulent"""
     try:
-        # Prepare transaction data
-        transaction_data = {
-            "user_id": transaction.user_id,
-            "amount": transaction.amount,
-            "location": transaction.location,
-            "device": transaction.device,
-            "timestamp": transaction.timestamp or datetime.now().isoformat()
-        }
+        payload = transaction.dict(exclude={"idempotency_key"})
+        fingerprint = request_cache.make_key(payload)
         
-        # Get prediction
-        result = fraud_predictor.predict_single_transaction(transaction_data)
+        # Retries are answered from the cache instead of rescored. An explicit
+        # key is scoped to the user; without one, the payload hash is only a
+        # safe retry key when the client pins the timestamp, otherwise repeated
+        # identical charges would be hidden from the logs and the store
+        if transaction.idempotency_key:
+            cache_key = "key:" + request_cache.make_key({
+                "user_id": transaction.user_id,
+                "idempotency_key": transaction.idempotency_key
+            })
+        elif transaction.timestamp:
+            cache_key = f"hash:{fingerprint}"
+        else:
+            cache_key = None
         
-        if "error" in result:
-            raise HTTPException(status_code=500, detail=result["error"])
-        
-        # Log the transaction
-        fraud_logger.log_transaction(
-            transaction.user_id,
-            result["prediction"],
-            result["confidence"],
-            transaction_data
-        )
-        
-        # Store in database
-        transaction_data.update(result)
-        db_manager.insert_transaction(transaction_data)
+        if cache_key is None:
+            result = _process_transaction(transaction)
+        else:
+            async def compute():
+                return _process_transaction(transaction)
+            
+            result = await request_cache.get_or_compute(cache_key, fingerprint, compute)
         
         return TransactionResponse(
             prediction=result["prediction"],
@@ -78,9 +109,18 @@ async def check_transaction(transaction: TransactionRequest):
             transaction_id=transaction.user_id
         )
         
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/cache_stats")
+async def get_cache_stats():
+    """Get idempotency cache statistics"""
+    return request_cache.stats()
+
 @app.get("/stats")
 async def get_stats():
     """Get fraud detection statistics"""
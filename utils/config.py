@@ -24,5 +24,9 @@ class Config:
     # API
     API_HOST = os.getenv("API_HOST", "0.0.0.0")
     API_PORT = int(os.getenv("API_PORT", "8000"))
+    
+    # Idempotency cache for retried requests
+    REQUEST_CACHE_SIZE = int(os.getenv("REQUEST_CACHE_SIZE", "10000"))
+    REQUEST_CACHE_TTL = float(os.getenv("REQUEST_CACHE_TTL", "300"))
 
 config = Config()
\ No newline at end of file
@@ -0,0 +1,127 @@
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Awaitable, Callable, Optional
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from utils.config import config
+
+class IdempotencyConflict(Exception):
+    """Raised when an idempotency key is reused with a different payload"""
+
+class RequestCache:
+    """Bounded TTL cache of recent verdicts keyed by idempotency key.
+
+    Each entry remembers a fingerprint of the payload it was computed for,
+    so a key reused for a different payload is rejected rather than
+    answered with another transaction's verdict. Concurrent requests for
+    the same key share a single in-flight computation.
+    """
+
+    def __init__(self, max_size=10000, ttl_seconds=300.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        # key -> (expires_at, fingerprint, value), oldest first. Every entry
+        # gets the same TTL, so insertion order is also expiry order.
+        self._entries = OrderedDict()
+        # key -> (fingerprint, task)
+        self._in_flight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def make_key(payload: Dict[str, Any]) -> str:
+        """Hash a request payload into a stable idempotency key"""
+        encoded = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def _purge_expired(self):
+        """Drop expired entries from the head of the cache"""
+        now = time.monotonic()
+        while self._entries:
+            key, (expires_at, _, _) = next(iter(self._entries.items()))
+            if expires_at > now:
+                break
+            del self._entries[key]
+
+    def _get(self, key: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        self._purge_expired()
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        _, cached_fingerprint, value = entry
+        if cached_fingerprint != fingerprint:
+            raise IdempotencyConflict("Idempotency key reused with a different payload")
+        return value
+
+    def _set(self, key: str, fingerprint: str, value: Dict[str, Any]):
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, fingerprint, value)
+        self._purge_expired()
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _on_done(self, key: str, fingerprint: str, task: asyncio.Task):
+        self._in_flight.pop(key, None)
+        if task.cancelled():
+            return
+        if task.exception() is None:
+            # Failures are not cached so that a later retry is rescored
+            self._set(key, fingerprint, task.result())
+
+    async def get_or_compute(self, key: str, fingerprint: str,
+                             compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Return the cached verdict for key, computing it at most once.
+
+        The computation runs as its own task, so cancelling the request
+        that started it does not strand requests waiting on the same key.
+        """
+        cached = self._get(key, fingerprint)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            pending_fingerprint, task = pending
+            if pending_fingerprint != fingerprint:
+                raise IdempotencyConflict("Idempotency key reused with a different payload")
+            self.coalesced += 1
+            return await asyncio.shield(task)
+
+        self.misses += 1
+        task = asyncio.ensure_future(compute())
+        self._in_flight[key] = (fingerprint, task)
+        task.add_done_callback(lambda t: self._on_done(key, fingerprint, t))
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        """Report cache counters.
+
+        ``hit_rate`` is the share of requests answered from a cached
+        verdict; requests that joined an in-flight computation are counted
+        only in ``coalesced``.
+        """
+        self._purge_expired()
+        total = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "in_flight": len(self._in_flight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits / total) if total > 0 else 0
+        }
+
+request_cache = RequestCache(
+    max_size=config.REQUEST_CACHE_SIZE,
+    ttl_seconds=config.REQUEST_CACHE_TTL
+)